@@ -2,10 +2,29 @@ import os
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
+from sqlalchemy.exc import OperationalError
 
 # Initialize SQLAlchemy
 db = SQLAlchemy()
 
+def upgrade_schema():
+    """Adds columns introduced after a table was first created, since create_all never alters existing tables"""
+    if not _has_column('receipt', 'merchant_id'):
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(db.text('ALTER TABLE receipt ADD COLUMN merchant_id VARCHAR(64)'))
+        except OperationalError:
+            # Another worker may have added the column since we looked
+            if not _has_column('receipt', 'merchant_id'):
+                raise
+    with db.engine.begin() as conn:
+        conn.execute(db.text('CREATE INDEX IF NOT EXISTS ix_receipt_merchant_id ON receipt (merchant_id)'))
+
+
+def _has_column(table, column):
+    return column in {c['name'] for c in db.inspect(db.engine).get_columns(table)}
+
+
 def create_app(config_name='default'):
     """Create and configure Flask application"""
     app = Flask(__name__, instance_relative_config=True)
@@ -38,6 +57,17 @@ def create_app(config_name='default'):
     # Create database tables
     with app.app_context():
         db.create_all()
+        upgrade_schema()
+        
+        # Build the merchant dictionary automaton once at startup
+        from app.services.merchant_service import get_merchant_matcher
+        get_merchant_matcher()
+        
+    @app.cli.command('prune-events')
+    def prune_events_command():
+        """Delete receipt events older than EVENT_RETENTION_DAYS"""
+        from app.services.event_service import prune_events
+        print(f"Deleted {prune_events()} expired receipt events")
         
     @app.route('/health', methods=['GET'])
     def health_check():
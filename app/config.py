@@ -15,14 +15,39 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
     # File upload configuration
-    UPLOAD_FOLDER = os.path.join(os.path.dirname(BASE_DIR), 'uploads')
+    UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER') or os.path.join(os.path.dirname(BASE_DIR), 'uploads')
     PROCESSED_FOLDER = os.path.join(UPLOAD_FOLDER, 'processed')
     UNPROCESSED_FOLDER = os.path.join(UPLOAD_FOLDER, 'unprocessed')
     ALLOWED_EXTENSIONS = {'pdf'}
     
     # OCR configuration
-    OCR_ENGINE = os.environ.get('OCR_ENGINE', 'tesseract')  # 'tesseract' or 'google_vision'
+    # Engine name or comma separated fallback chain, e.g. 'google_vision,tesseract'.
+    # Engines: 'tesseract', 'google_vision' or 'stub' for load tests
+    OCR_ENGINE = os.environ.get('OCR_ENGINE', 'tesseract')
+    OCR_DPI = 200  # Resolution pages are rendered at before OCR
     GOOGLE_APPLICATION_CREDENTIALS = os.environ.get('GOOGLE_APPLICATION_CREDENTIALS')
+    GOOGLE_VISION_API_KEY = os.environ.get('GOOGLE_VISION_API_KEY')
+    GOOGLE_VISION_ENDPOINT = os.environ.get('GOOGLE_VISION_ENDPOINT') or \
+        'https://vision.googleapis.com/v1/images:annotate'
+    OCR_BATCH_SIZE = int(os.environ.get('OCR_BATCH_SIZE', 8))  # Pages per Google Vision request (max 16)
+    OCR_MAX_CONCURRENCY = int(os.environ.get('OCR_MAX_CONCURRENCY', 4))  # Concurrent Google Vision requests per worker
+    OCR_RATE_LIMIT = float(os.environ.get('OCR_RATE_LIMIT', 10))  # Google Vision requests per second per worker, 0 for no limit
+    OCR_REQUEST_TIMEOUT = float(os.environ.get('OCR_REQUEST_TIMEOUT', 30))  # Seconds
+    
+    # Merchant recognition configuration
+    MERCHANT_DICTIONARY_PATH = os.environ.get('MERCHANT_DICTIONARY_PATH') or \
+        os.path.join(BASE_DIR, 'data', 'merchants.json')
+    MERCHANT_FUZZY_THRESHOLD = float(os.environ.get('MERCHANT_FUZZY_THRESHOLD', 0.85))
+    
+    # Event stream configuration
+    EVENT_STREAM_BACKEND = os.environ.get('EVENT_STREAM_BACKEND', 'memory')  # 'memory' or 'database' for multiple workers
+    EVENT_STREAM_HEARTBEAT = 15  # Seconds between keepalive comments on idle streams
+    EVENT_STREAM_POLL_INTERVAL = 2  # Seconds between database polls with the 'database' backend
+    EVENT_STREAM_LOOKBACK = 50  # Event ids re-read below the newest sent, for events that commit out of id order
+    EVENT_STREAM_QUEUE_SIZE = 100  # Events buffered per client before it falls back to the database
+    EVENT_STREAM_RETRY_MS = 3000  # Reconnect delay suggested to clients
+    EVENT_RETENTION_DAYS = int(os.environ.get('EVENT_RETENTION_DAYS', 7))  # Stored events older than this are deleted
+    EVENT_PRUNE_INTERVAL = 3600  # Seconds between automatic pruning of expired events per worker
 
 
 class DevelopmentConfig(Config):
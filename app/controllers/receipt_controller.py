@@ -1,10 +1,11 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from app.services.receipt_service import (
     create_receipt_file,
     validate_receipt_file,
     process_receipt_file,
     get_receipt_by_id
 )
+from app.services.event_service import EVENT_TYPES, stream_events
 from app.utils.validators import validate_receipt_file_upload
 
 receipt_bp = Blueprint('receipt', __name__)
@@ -56,7 +57,7 @@ def process_receipt():
         return jsonify({'error': 'Receipt file ID is required'}), 400
         
     try:
-        receipt = process_receipt_file(data['receipt_file_id'])
+        receipt = process_receipt_file(data['receipt_file_id'], data.get('ocr_engine'))
         return jsonify({
             'message': 'Receipt processed successfully',
             'receipt_id': receipt.id
@@ -97,4 +98,33 @@ def get_receipt(receipt_id):
         return jsonify(receipt.to_dict()), 200
         
     except Exception as e:
-        return jsonify({'error': f'Error getting receipt: {str(e)}'}), 500
\ No newline at end of file
+        return jsonify({'error': f'Error getting receipt: {str(e)}'}), 500
+
+@receipt_bp.route('/events', methods=['GET'])
+def receipt_events():
+    """Streams receipt file status events as Server-Sent Events, optionally filtered by file and event type."""
+    receipt_file_id = request.args.get('receipt_file_id')
+    if receipt_file_id is not None:
+        try:
+            receipt_file_id = int(receipt_file_id)
+        except ValueError:
+            return jsonify({'error': 'receipt_file_id must be an integer'}), 400
+    
+    event_types = [t.strip() for t in request.args.get('types', '').split(',') if t.strip()]
+    unknown = [t for t in event_types if t not in EVENT_TYPES]
+    if unknown:
+        return jsonify({'error': f"Unknown event types: {', '.join(unknown)}"}), 400
+        
+    # Browsers resend Last-Event-ID on reconnect; the query parameter allows resuming a fresh connection
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    if last_event_id is not None:
+        try:
+            last_event_id = int(last_event_id)
+        except ValueError:
+            return jsonify({'error': 'Last-Event-ID must be an integer'}), 400
+            
+    stream = stream_events(last_event_id, receipt_file_id, event_types)
+    return Response(stream_with_context(stream), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
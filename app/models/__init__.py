@@ -1,3 +1,4 @@
 from .receipt import Receipt, ReceiptFile, ReceiptItem
+from .event import ReceiptEvent
 
-__all__ = ['Receipt', 'ReceiptFile', 'ReceiptItem']
+__all__ = ['Receipt', 'ReceiptFile', 'ReceiptItem', 'ReceiptEvent']
@@ -0,0 +1,24 @@
+import json
+from datetime import datetime
+from app import db
+
+
+class ReceiptEvent(db.Model):
+    """Model for storing receipt file status events streamed to clients"""
+    __tablename__ = 'receipt_event'
+
+    id = db.Column(db.Integer, primary_key=True)
+    receipt_file_id = db.Column(db.Integer, db.ForeignKey('receipt_file.id'), nullable=False, index=True)
+    event_type = db.Column(db.String(20), nullable=False)
+    payload = db.Column(db.Text, nullable=True)  # JSON encoded event data
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert model instance to dictionary"""
+        return {
+            'id': self.id,
+            'receipt_file_id': self.receipt_file_id,
+            'event_type': self.event_type,
+            'data': json.loads(self.payload) if self.payload else {},
+            'created_at': self.created_at.isoformat()
+        }
@@ -39,6 +39,7 @@ class Receipt(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     receipt_file_id = db.Column(db.Integer, db.ForeignKey('receipt_file.id'), nullable=False)
     merchant_name = db.Column(db.String(255))
+    merchant_id = db.Column(db.String(64), nullable=True, index=True)  # Canonical id from the merchant dictionary
     purchased_at = db.Column(db.DateTime, nullable=True)
     total_amount = db.Column(db.Float, nullable=True)
     currency = db.Column(db.String(10), nullable=True)
@@ -59,6 +60,7 @@ class Receipt(db.Model):
             'id': self.id,
             'receipt_file_id': self.receipt_file_id,
             'merchant_name': self.merchant_name,
+            'merchant_id': self.merchant_id,
             'purchased_at': self.purchased_at.isoformat() if self.purchased_at else None,
             'total_amount': self.total_amount,
             'currency': self.currency,
@@ -11,6 +11,26 @@ from .ocr_service import (
     parse_receipt
 )
 
+from .ocr_engines import (
+    OCREngine,
+    OCRError,
+    get_ocr_engine,
+    register_engine
+)
+
+from .merchant_service import (
+    MerchantMatcher,
+    get_merchant_matcher,
+    match_merchant
+)
+
+from .event_service import (
+    record_event,
+    publish_events,
+    prune_events,
+    stream_events
+)
+
 from .receipt_service import (
     create_receipt_file,
     validate_receipt_file,
@@ -28,6 +48,17 @@ __all__ = [
     'get_file_path',
     'extract_text_from_pdf',
     'parse_receipt',
+    'OCREngine',
+    'OCRError',
+    'get_ocr_engine',
+    'register_engine',
+    'MerchantMatcher',
+    'get_merchant_matcher',
+    'match_merchant',
+    'record_event',
+    'publish_events',
+    'prune_events',
+    'stream_events',
     'create_receipt_file',
     'validate_receipt_file',
     'process_receipt_file',
@@ -0,0 +1,216 @@
+import json
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from flask import current_app
+from app import db
+from app.models.event import ReceiptEvent
+
+EVENT_TYPES = ('uploaded', 'validated', 'processed', 'failed')
+
+# Maximum number of stored events sent per catch-up query
+CATCH_UP_BATCH_SIZE = 100
+
+
+class Subscription:
+    """A subscriber's bounded queue of events. Flags overflow instead of blocking publishers."""
+
+    def __init__(self, maxsize):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def drain(self):
+        """Discards queued events, used after an overflow once the stream catches up from the database."""
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+        self.overflowed = False
+
+
+class EventHub:
+    """In-process publish/subscribe hub that fans events out to streaming clients."""
+
+    def __init__(self):
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, maxsize=100):
+        subscription = Subscription(maxsize)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.put(event)
+
+
+event_hub = EventHub()
+
+# Keeps events from one process reaching the hub in the order they are published
+_publish_lock = threading.Lock()
+
+# When this process last deleted expired events
+_last_pruned = 0.0
+
+
+def record_event(event_type, receipt_file_id, data=None):
+    """Adds a receipt file event to the session so it is committed with the change it describes."""
+    if event_type not in EVENT_TYPES:
+        raise ValueError(f"Unknown event type: {event_type}")
+
+    event = ReceiptEvent(
+        receipt_file_id=receipt_file_id,
+        event_type=event_type,
+        payload=json.dumps(data or {})
+    )
+    db.session.add(event)
+    return event
+
+
+def publish_events(*events):
+    """Notifies streaming clients in this process of committed events, and prunes expired events now and then."""
+    with _publish_lock:
+        for event in events:
+            event_hub.publish(event.to_dict())
+
+    global _last_pruned
+    now = time.monotonic()
+    if now - _last_pruned >= current_app.config['EVENT_PRUNE_INTERVAL']:
+        _last_pruned = now
+        try:
+            prune_events()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Error pruning receipt events: {str(e)}")
+
+
+def prune_events(retention_days=None):
+    """Deletes events older than the retention period. Returns the number of events deleted."""
+    retention_days = retention_days or current_app.config['EVENT_RETENTION_DAYS']
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    deleted = ReceiptEvent.query.filter(ReceiptEvent.created_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+def get_events_since(last_event_id, receipt_file_id=None, event_types=None, limit=CATCH_UP_BATCH_SIZE):
+    """Gets stored events newer than last_event_id, oldest first, optionally filtered. Ids older than the
+    retention period resume from the oldest event still stored."""
+    query = ReceiptEvent.query.filter(ReceiptEvent.id > last_event_id)
+    if receipt_file_id is not None:
+        query = query.filter(ReceiptEvent.receipt_file_id == receipt_file_id)
+    if event_types:
+        query = query.filter(ReceiptEvent.event_type.in_(event_types))
+    return [event.to_dict() for event in query.order_by(ReceiptEvent.id).limit(limit).all()]
+
+
+def get_latest_event_id():
+    """Gets the id of the most recent stored event, or 0 if there are none."""
+    return db.session.query(db.func.max(ReceiptEvent.id)).scalar() or 0
+
+
+def format_sse(event):
+    """Formats an event as a Server-Sent Events message."""
+    return f"id: {event['id']}\nevent: {event['event_type']}\ndata: {json.dumps(event)}\n\n"
+
+
+def stream_events(last_event_id=None, receipt_file_id=None, event_types=None):
+    """Yields receipt file events as Server-Sent Events messages until the client disconnects.
+
+    With the 'memory' backend events are delivered straight from the in-process hub. With the
+    'database' backend, for deployments with several workers, the hub only wakes the stream early
+    and events are always read back from the database so events published by other workers are
+    seen, re-reading the last EVENT_STREAM_LOOKBACK ids to catch events that committed late.
+    Either way a stream that falls behind catches up from the database.
+    """
+    config = current_app.config
+    use_database = config['EVENT_STREAM_BACKEND'] == 'database'
+    heartbeat = config['EVENT_STREAM_HEARTBEAT']
+    poll_interval = config['EVENT_STREAM_POLL_INTERVAL']
+    lookback = config['EVENT_STREAM_LOOKBACK']
+
+    def matches(event):
+        if receipt_file_id is not None and event['receipt_file_id'] != receipt_file_id:
+            return False
+        return not event_types or event['event_type'] in event_types
+
+    # Subscribe before reading the backlog so no event published in between is missed
+    subscription = event_hub.subscribe(maxsize=config['EVENT_STREAM_QUEUE_SIZE'])
+    try:
+        last_id = get_latest_event_id() if last_event_id is None else last_event_id
+        start_id = last_id
+        # Events are committed concurrently, so they can arrive slightly out of id order.
+        # Recently sent ids let late events through without sending duplicates.
+        sent_ids = deque(maxlen=lookback + CATCH_UP_BATCH_SIZE + config['EVENT_STREAM_QUEUE_SIZE'])
+        catch_up = last_event_id is not None
+        # Release the connection so idle streams don't hold one open
+        db.session.remove()
+        last_sent = time.monotonic()
+
+        yield f"retry: {config['EVENT_STREAM_RETRY_MS']}\n\n"
+
+        while True:
+            if catch_up or subscription.overflowed:
+                if subscription.overflowed:
+                    subscription.drain()
+                # Re-read a window below the newest event sent: where ids are allocated before
+                # commit (e.g. Postgres sequences) a lower id can become visible after a higher one
+                cursor = max(start_id, last_id - lookback)
+                while True:
+                    events = get_events_since(cursor, receipt_file_id, event_types)
+                    db.session.remove()
+                    for event in events:
+                        cursor = event['id']
+                        if event['id'] in sent_ids:
+                            continue
+                        last_id = max(last_id, event['id'])
+                        sent_ids.append(event['id'])
+                        yield format_sse(event)
+                        last_sent = time.monotonic()
+                    # Keep reading while full batches come back
+                    if len(events) < CATCH_UP_BATCH_SIZE:
+                        break
+                catch_up = False
+
+            timeout = max(0.0, last_sent + heartbeat - time.monotonic())
+            if use_database:
+                timeout = min(timeout, poll_interval)
+            event = subscription.get(timeout=timeout)
+
+            if use_database:
+                # Any wake-up or poll timeout triggers a read from the shared database
+                catch_up = True
+            elif event is not None and event['id'] > start_id and event['id'] not in sent_ids and matches(event):
+                last_id = max(last_id, event['id'])
+                sent_ids.append(event['id'])
+                yield format_sse(event)
+                last_sent = time.monotonic()
+
+            if time.monotonic() - last_sent >= heartbeat:
+                yield ": keepalive\n\n"
+                last_sent = time.monotonic()
+    finally:
+        event_hub.unsubscribe(subscription)
@@ -21,7 +21,7 @@ def save_file(file):
         raise ValueError("Invalid filename")
         
     # Create uploads directory if it doesn't exist
-    upload_dir = os.path.join(current_app.root_path, '..', 'uploads')
+    upload_dir = current_app.config['UPLOAD_FOLDER']
     os.makedirs(upload_dir, exist_ok=True)
     
     # Save file
@@ -58,4 +58,4 @@ def move_to_processed_folder(file_path):
 
 def get_file_path(filename):
     """Gets the full path for a file in the uploads directory."""
-    return os.path.join(current_app.root_path, '..', 'uploads', secure_filename(filename))
\ No newline at end of file
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], secure_filename(filename))
\ No newline at end of file
@@ -0,0 +1,221 @@
+import json
+import os
+import re
+import threading
+from collections import Counter, deque
+from difflib import SequenceMatcher
+from flask import current_app
+
+# Cached matchers keyed by dictionary path, built once per process
+_matchers = {}
+_matchers_lock = threading.Lock()
+
+# Trigrams shared by more aliases than this are too common to narrow the
+# fuzzy search, so they are skipped to keep lookups independent of dictionary size
+MAX_TRIGRAM_POSTINGS = 500
+
+# Number of fuzzy candidates verified with a full similarity check
+FUZZY_CANDIDATES = 5
+
+# Aliases shorter than this only match exactly; one changed letter already
+# turns them into other words ('bart' and 'art')
+MIN_FUZZY_ALIAS_LENGTH = 5
+
+
+def normalize_text(text):
+    """Lowercases text and collapses anything that isn't a letter or digit into single spaces."""
+    return re.sub(r'[^0-9a-z]+', ' ', text.lower()).strip()
+
+
+def load_merchant_dictionary(path):
+    """Loads merchant entries from a JSON file. Each entry needs an 'id' and 'name' and may list 'aliases'."""
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+
+    merchants = []
+    for entry in entries:
+        if not entry.get('id') or not entry.get('name'):
+            raise ValueError(f"Merchant entry missing 'id' or 'name': {entry}")
+        merchants.append({
+            'id': str(entry['id']),
+            'name': entry['name'],
+            'aliases': list(entry.get('aliases', []))
+        })
+    return merchants
+
+
+class MerchantMatcher:
+    """Matches OCR text against a merchant dictionary using an Aho-Corasick automaton with a trigram fuzzy fallback."""
+
+    def __init__(self, merchants, fuzzy_threshold=0.85):
+        self.merchants = merchants
+        self.fuzzy_threshold = fuzzy_threshold
+
+        # Patterns are (normalized alias, merchant index); padding with spaces
+        # makes the automaton only report whole-word matches
+        self._patterns = []
+        seen = set()
+        for idx, merchant in enumerate(merchants):
+            for alias in [merchant['name']] + merchant['aliases']:
+                normalized = normalize_text(alias)
+                if normalized and (normalized, idx) not in seen:
+                    seen.add((normalized, idx))
+                    self._patterns.append((normalized, idx))
+
+        self._build_automaton()
+        self._build_trigram_index()
+
+    def _build_automaton(self):
+        """Builds the goto, failure and output links for all patterns."""
+        self._goto = [{}]
+        self._fail = [0]
+        self._terminal = [None]  # pattern index ending exactly at this node
+        self._out = [0]  # nearest node on the failure chain with a terminal
+
+        for pattern_idx, (alias, _) in enumerate(self._patterns):
+            node = 0
+            for ch in f' {alias} ':
+                next_node = self._goto[node].get(ch)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][ch] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._terminal.append(None)
+                    self._out.append(0)
+                node = next_node
+            # Keep the first pattern when two merchants share an alias
+            if self._terminal[node] is None:
+                self._terminal[node] = pattern_idx
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail_target = self._goto[fail].get(ch, 0)
+                self._fail[child] = fail_target if fail_target != child else 0
+                target = self._fail[child]
+                self._out[child] = target if self._terminal[target] is not None else self._out[target]
+
+    def _build_trigram_index(self):
+        """Builds an inverted index from character trigrams to the indexes of patterns long enough for fuzzy matching."""
+        self._trigrams = {}
+        for pattern_idx, (alias, _) in enumerate(self._patterns):
+            if len(alias) < MIN_FUZZY_ALIAS_LENGTH:
+                continue
+            for gram in _trigrams(alias):
+                self._trigrams.setdefault(gram, []).append(pattern_idx)
+
+    def find_all(self, text):
+        """Returns (start, pattern_index) for every dictionary alias found in normalized text."""
+        padded = f' {text} '
+        matches = []
+        node = 0
+        for pos, ch in enumerate(padded):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+
+            hit = node if self._terminal[node] is not None else self._out[node]
+            while hit:
+                pattern_idx = self._terminal[hit]
+                length = len(self._patterns[pattern_idx][0]) + 2
+                matches.append((pos - length + 1, pattern_idx))
+                hit = self._out[hit]
+        return matches
+
+    def match(self, text, header_lines=5):
+        """Finds the merchant printed in the header of receipt text. Returns a dict with id, name and score, or None.
+
+        Only the first header_lines non-empty lines are searched, since merchant names that
+        appear further down (items, payment lines) usually aren't the merchant. Lines are tried
+        top to bottom and the first line with an exact or fuzzy hit wins.
+        """
+        lines = [normalize_text(line) for line in text.split('\n')]
+        lines = [line for line in lines if line][:header_lines]
+
+        for line in lines:
+            matches = self.find_all(line)
+            if matches:
+                # The longest alias wins, then the earliest one on the line
+                start, pattern_idx = min(matches, key=lambda m: (-len(self._patterns[m[1]][0]), m[0]))
+                return self._result(pattern_idx, 1.0)
+
+            candidate = self._fuzzy_match_line(line)
+            if candidate:
+                return self._result(*candidate)
+        return None
+
+    def _fuzzy_match_line(self, line):
+        """Finds the closest alias to a line using shared trigrams, verified with a similarity ratio."""
+        counts = Counter()
+        for gram in _trigrams(line):
+            postings = self._trigrams.get(gram)
+            if postings and len(postings) <= MAX_TRIGRAM_POSTINGS:
+                counts.update(postings)
+
+        best = None
+        for pattern_idx, _ in counts.most_common(FUZZY_CANDIDATES):
+            score = _best_window_ratio(self._patterns[pattern_idx][0], line)
+            if score >= self.fuzzy_threshold and (best is None or score > best[1]):
+                best = (pattern_idx, score)
+        return best
+
+    def _result(self, pattern_idx, score):
+        merchant = self.merchants[self._patterns[pattern_idx][1]]
+        return {
+            'merchant_id': merchant['id'],
+            'merchant_name': merchant['name'],
+            'score': score
+        }
+
+
+def _trigrams(text):
+    padded = f' {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _best_window_ratio(alias, line):
+    """Compares an alias against every window of the line with the same number of words."""
+    alias_words = alias.split()
+    line_words = line.split()
+    size = len(alias_words)
+    if len(line_words) <= size:
+        return SequenceMatcher(None, alias, line).ratio()
+
+    best = 0.0
+    for i in range(len(line_words) - size + 1):
+        window = ' '.join(line_words[i:i + size])
+        best = max(best, SequenceMatcher(None, alias, window).ratio())
+    return best
+
+
+def get_merchant_matcher(path=None):
+    """Returns the cached matcher for the configured merchant dictionary, building it on first use."""
+    path = path or current_app.config.get('MERCHANT_DICTIONARY_PATH')
+    if not path or not os.path.exists(path):
+        return None
+
+    matcher = _matchers.get(path)
+    if matcher is None:
+        with _matchers_lock:
+            matcher = _matchers.get(path)
+            if matcher is None:
+                matcher = MerchantMatcher(
+                    load_merchant_dictionary(path),
+                    fuzzy_threshold=current_app.config.get('MERCHANT_FUZZY_THRESHOLD', 0.85)
+                )
+                _matchers[path] = matcher
+    return matcher
+
+
+def match_merchant(header_text):
+    """Matches receipt header text against the merchant dictionary. Returns None if nothing matches."""
+    matcher = get_merchant_matcher()
+    if matcher is None:
+        return None
+    return matcher.match(header_text)
@@ -0,0 +1,299 @@
+import asyncio
+import base64
+import io
+import threading
+import time
+import pytesseract
+from pdf2image import convert_from_path
+from pypdf import PdfReader
+from flask import current_app
+
+
+class OCRError(Exception):
+    """Raised when an OCR engine can't extract text from a file."""
+
+
+class OCREngine:
+    """Base class for OCR backends. Subclasses return (text, confidence) with confidence between 0 and 1."""
+    name = None
+
+    def __init__(self, config):
+        self.config = config
+
+    def extract(self, pdf_path):
+        raise NotImplementedError
+
+    def render_pages(self, pdf_path):
+        """Renders each PDF page to an image at the configured resolution."""
+        return convert_from_path(pdf_path, dpi=self.config['OCR_DPI'])
+
+
+def format_pages(page_texts):
+    """Joins per-page text with the page markers parse_receipt expects."""
+    return ''.join(f"--- PAGE {i+1} ---\n{text}\n\n" for i, text in enumerate(page_texts))
+
+
+class TesseractEngine(OCREngine):
+    """Local OCR with Tesseract. Converts PDF to images first, then uses OCR to get text and confidence scores."""
+    name = 'tesseract'
+
+    def extract(self, pdf_path):
+        try:
+            page_texts = []
+            confidence_sum = 0
+
+            for image in self.render_pages(pdf_path):
+                data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+
+                conf_values = [int(conf) for conf in data['conf'] if conf != '-1']
+                if conf_values:
+                    confidence_sum += sum(conf_values) / len(conf_values)
+
+                page_texts.append(pytesseract.image_to_string(image))
+
+            avg_confidence = confidence_sum / len(page_texts) if page_texts else 0
+            return format_pages(page_texts), avg_confidence / 100.0
+
+        except Exception as e:
+            raise OCRError(f"Tesseract OCR error: {str(e)}") from e
+
+
+class StubEngine(OCREngine):
+    """Deterministic stand-in for OCR used by load tests. Reads the PDF's embedded text layer instead of rendering and running Tesseract."""
+    name = 'stub'
+
+    def extract(self, pdf_path):
+        try:
+            reader = PdfReader(pdf_path)
+            return format_pages([page.extract_text() or '' for page in reader.pages]), 1.0
+        except Exception as e:
+            raise OCRError(f"Stub OCR error: {str(e)}") from e
+
+
+class AsyncRateLimiter:
+    """Spaces out calls so no more than rate start per second. A rate of 0 disables limiting."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self._next_slot = 0.0
+        self._lock = None
+
+    async def wait(self):
+        if not self.interval:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class GoogleVisionEngine(OCREngine):
+    """OCR with the Google Cloud Vision REST API.
+
+    Pages are rendered to PNG and sent in batched images:annotate requests, issued concurrently
+    from a background event loop that keeps one HTTP session open for the life of the process,
+    so connections are reused across receipts. Batch requests are rate limited per process.
+    """
+    name = 'google_vision'
+
+    SCOPES = ['https://www.googleapis.com/auth/cloud-vision']
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.endpoint = config['GOOGLE_VISION_ENDPOINT']
+        self.api_key = config.get('GOOGLE_VISION_API_KEY')
+        self.batch_size = max(1, min(16, config['OCR_BATCH_SIZE']))  # The API accepts at most 16 images per request
+        self.max_concurrency = config['OCR_MAX_CONCURRENCY']
+        self.timeout = config['OCR_REQUEST_TIMEOUT']
+        self._credentials = None
+        self._credentials_lock = threading.Lock()
+        self._loop = None
+        self._session = None
+        self._semaphore = None
+        self._rate_limiter = AsyncRateLimiter(config['OCR_RATE_LIMIT'])
+        self._start_lock = threading.Lock()
+
+    def extract(self, pdf_path):
+        try:
+            encoded = [self._encode_image(image) for image in self.render_pages(pdf_path)]
+        except Exception as e:
+            raise OCRError(f"Google Vision OCR error: {str(e)}") from e
+
+        if not encoded:
+            return "", 0.0
+
+        batches = [encoded[i:i + self.batch_size] for i in range(0, len(encoded), self.batch_size)]
+        headers = self._auth_headers()
+        future = asyncio.run_coroutine_threadsafe(self._annotate_all(batches, headers), self._get_loop())
+        try:
+            # Batches run in parallel, but allow for ones queued behind the concurrency and rate limits
+            responses = future.result(timeout=self.timeout * len(batches))
+        except OCRError:
+            raise
+        except Exception as e:
+            future.cancel()
+            raise OCRError(f"Google Vision OCR error: {str(e) or type(e).__name__}") from e
+
+        page_texts = []
+        confidences = []
+        for response in responses:
+            if 'error' in response:
+                raise OCRError(f"Google Vision OCR error: {response['error'].get('message', response['error'])}")
+            annotation = response.get('fullTextAnnotation', {})
+            page_texts.append(annotation.get('text', ''))
+            confidences += [page['confidence'] for page in annotation.get('pages', []) if 'confidence' in page]
+
+        confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        return format_pages(page_texts), confidence
+
+    def _encode_image(self, image):
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG')
+        return base64.b64encode(buffer.getvalue()).decode('ascii')
+
+    def _auth_headers(self):
+        """Uses the API key if configured, otherwise a bearer token from the service account credentials."""
+        if self.api_key:
+            return {'X-Goog-Api-Key': self.api_key}
+        if not self.config.get('GOOGLE_APPLICATION_CREDENTIALS'):
+            raise OCRError("Google Vision requires GOOGLE_VISION_API_KEY or GOOGLE_APPLICATION_CREDENTIALS")
+
+        try:
+            from google.oauth2 import service_account
+            from google.auth.transport.requests import Request
+        except ImportError as e:
+            raise OCRError("google-auth is required to use GOOGLE_APPLICATION_CREDENTIALS") from e
+
+        with self._credentials_lock:
+            try:
+                if self._credentials is None:
+                    self._credentials = service_account.Credentials.from_service_account_file(
+                        self.config['GOOGLE_APPLICATION_CREDENTIALS'], scopes=self.SCOPES
+                    )
+                if not self._credentials.valid:
+                    self._credentials.refresh(Request())
+            except Exception as e:
+                raise OCRError(f"Google Vision authentication error: {str(e)}") from e
+            return {'Authorization': f'Bearer {self._credentials.token}'}
+
+    def _get_loop(self):
+        """Starts the background event loop and HTTP session on first use."""
+        with self._start_lock:
+            if self._loop is None:
+                try:
+                    import aiohttp  # noqa: F401
+                except ImportError as e:
+                    raise OCRError("aiohttp is required for the Google Vision OCR engine") from e
+
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='google-vision-ocr', daemon=True).start()
+                asyncio.run_coroutine_threadsafe(self._open_session(), loop).result()
+                self._loop = loop
+        return self._loop
+
+    async def _open_session(self):
+        import aiohttp
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+
+    async def _annotate_all(self, batches, headers):
+        results = await asyncio.gather(*(self._annotate(batch, headers) for batch in batches))
+        return [response for batch in results for response in batch]
+
+    async def _annotate(self, batch, headers):
+        payload = {
+            'requests': [
+                {
+                    'image': {'content': content},
+                    'features': [{'type': 'DOCUMENT_TEXT_DETECTION'}]
+                }
+                for content in batch
+            ]
+        }
+        async with self._semaphore:
+            await self._rate_limiter.wait()
+            async with self._session.post(self.endpoint, json=payload, headers=headers) as response:
+                if response.status != 200:
+                    raise OCRError(f"Google Vision returned HTTP {response.status}: {await response.text()}")
+                data = await response.json()
+
+        responses = data.get('responses', [])
+        if len(responses) != len(batch):
+            raise OCRError(f"Google Vision returned {len(responses)} responses for {len(batch)} pages")
+        return responses
+
+
+class FallbackEngine(OCREngine):
+    """Tries each engine in turn, moving on when one fails or finds no text."""
+
+    def __init__(self, engines):
+        super().__init__(engines[0].config)
+        self.engines = engines
+        self.name = ','.join(engine.name for engine in engines)
+
+    def extract(self, pdf_path):
+        errors = []
+        for engine in self.engines:
+            try:
+                text, confidence = engine.extract(pdf_path)
+            except OCRError as e:
+                current_app.logger.warning(f"OCR engine '{engine.name}' failed, trying next: {str(e)}")
+                errors.append(str(e))
+                continue
+            if text.strip():
+                return text, confidence
+            errors.append(f"{engine.name} found no text")
+        raise OCRError('; '.join(errors))
+
+
+# Engine classes by name; register_engine adds new backends
+ENGINES = {
+    TesseractEngine.name: TesseractEngine,
+    StubEngine.name: StubEngine,
+    GoogleVisionEngine.name: GoogleVisionEngine,
+}
+
+# Engine instances are cached per process so sessions and credentials are reused
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def register_engine(engine_class):
+    """Registers an OCR engine class under its name."""
+    ENGINES[engine_class.name] = engine_class
+    return engine_class
+
+
+def get_ocr_engine(spec=None):
+    """Gets the engine for a name or comma separated fallback chain, defaulting to the OCR_ENGINE setting."""
+    spec = spec or current_app.config['OCR_ENGINE']
+    if not isinstance(spec, str):
+        raise ValueError("OCR engine must be a string")
+    names = [name.strip() for name in spec.split(',') if name.strip()]
+    if not names:
+        raise ValueError("No OCR engine configured")
+
+    unknown = [name for name in names if name not in ENGINES]
+    if unknown:
+        raise ValueError(f"Unknown OCR engine: {', '.join(unknown)}. Available: {', '.join(sorted(ENGINES))}")
+
+    engines = [_get_instance(name) for name in names]
+    return engines[0] if len(engines) == 1 else FallbackEngine(engines)
+
+
+def _get_instance(name):
+    engine = _instances.get(name)
+    if engine is None:
+        with _instances_lock:
+            engine = _instances.get(name)
+            if engine is None:
+                engine = ENGINES[name](current_app.config)
+                _instances[name] = engine
+    return engine
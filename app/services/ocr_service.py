@@ -1,46 +1,24 @@
 import os
 import re
-import pytesseract
-from PIL import Image
 from datetime import datetime
-from pdf2image import convert_from_path
-from flask import current_app
-import tempfile
+from app.services.merchant_service import match_merchant
+from app.services.ocr_engines import get_ocr_engine
 
-def extract_text_from_pdf(pdf_path):
-    """Extracts text from PDF using Tesseract OCR. Converts PDF to images first, then uses OCR to get text and confidence scores."""
-    try:
-        all_text = ""
-        confidence_sum = 0
-        page_count = 0
-        
-        with tempfile.TemporaryDirectory() as temp_dir:
-            images = convert_from_path(pdf_path, output_folder=temp_dir)
-            
-            for i, image in enumerate(images):
-                page_count += 1
-                data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
-                
-                conf_values = [int(conf) for conf in data['conf'] if conf != '-1']
-                if conf_values:
-                    confidence_sum += sum(conf_values) / len(conf_values)
-                
-                page_text = pytesseract.image_to_string(image)
-                all_text += f"--- PAGE {i+1} ---\n{page_text}\n\n"
-        
-        avg_confidence = confidence_sum / page_count if page_count > 0 else 0
-        return all_text, avg_confidence / 100.0
-    
-    except Exception as e:
-        current_app.logger.error(f"Tesseract OCR error: {str(e)}")
-        return "", 0.0
+# Prices and totals mark the end of a receipt's header
+HEADER_END_PATTERN = re.compile(r'[$€£]|\d+[.,]\d{2}\b|total|amount', re.IGNORECASE)
+
+def extract_text_from_pdf(pdf_path, engine=None):
+    """Extracts text from PDF with the given OCR engine, or the one selected by OCR_ENGINE. Returns the text and a confidence score between 0 and 1. Raises OCRError if the engine, or every engine in a fallback chain, fails."""
+    engine = engine or get_ocr_engine()
+    return engine.extract(pdf_path)
 
 def parse_receipt(text):
-    """Parses receipt text into structured data. Looks for merchant name, items, and total amount."""
+    """Parses receipt text into structured data. Looks for merchant name, items, and total amount. Merchant names in the receipt header that are found in the merchant dictionary are replaced by their canonical name and id."""
     lines = text.split('\n')
     
     receipt_data = {
         'merchant_name': '',
+        'merchant_id': None,
         'purchased_at': datetime.now(),
         'total_amount': 0.0,
         'currency': 'USD',
@@ -58,6 +36,19 @@ def parse_receipt(text):
             receipt_data['merchant_name'] = line
             break
     
+    # Only the header is matched against the merchant dictionary. It ends at the
+    # first price or total line, and the matcher itself only looks at its first lines
+    header = []
+    for line in lines:
+        if HEADER_END_PATTERN.search(line):
+            break
+        header.append(line)
+    
+    merchant = match_merchant('\n'.join(header))
+    if merchant:
+        receipt_data['merchant_name'] = merchant['merchant_name']
+        receipt_data['merchant_id'] = merchant['merchant_id']
+    
     in_items_section = False
     for line in lines:
         line = line.strip()
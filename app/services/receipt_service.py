@@ -3,6 +3,8 @@ from app import db
 from app.models.receipt import ReceiptFile, Receipt, ReceiptItem
 from app.services.file_service import save_file, validate_pdf, move_to_processed_folder
 from app.services.ocr_service import extract_text_from_pdf, parse_receipt
+from app.services.ocr_engines import get_ocr_engine
+from app.services.event_service import record_event, publish_events
 import os
 
 
@@ -20,8 +22,12 @@ def create_receipt_file(file):
     )
     
     db.session.add(receipt_file)
+    db.session.flush()
+    event = record_event('uploaded', receipt_file.id, {'file_name': filename})
     db.session.commit()
     
+    publish_events(event)
+    
     return receipt_file
 
 
@@ -37,8 +43,14 @@ def validate_receipt_file(receipt_file_id):
     # Update receipt file record
     receipt_file.is_valid = is_valid
     receipt_file.invalid_reason = reason if not is_valid else None
+    if is_valid:
+        event = record_event('validated', receipt_file.id)
+    else:
+        event = record_event('failed', receipt_file.id, {'stage': 'validate', 'reason': reason})
     db.session.commit()
     
+    publish_events(event)
+    
     return {
         'receipt_file_id': receipt_file.id,
         'is_valid': is_valid,
@@ -46,8 +58,8 @@ def validate_receipt_file(receipt_file_id):
     }
 
 
-def process_receipt_file(receipt_file_id):
-    """Processes a receipt file by extracting text and creating a receipt record with items."""
+def process_receipt_file(receipt_file_id, ocr_engine=None):
+    """Processes a receipt file by extracting text and creating a receipt record with items. ocr_engine overrides the configured OCR engine or fallback chain."""
     receipt_file = ReceiptFile.query.get(receipt_file_id)
     if not receipt_file:
         raise ValueError("Receipt file not found")
@@ -55,8 +67,31 @@ def process_receipt_file(receipt_file_id):
     if not receipt_file.is_valid:
         raise ValueError(f"Invalid receipt file: {receipt_file.invalid_reason}")
         
+    engine = get_ocr_engine(ocr_engine)
+    
+    try:
+        receipt = _create_receipt(receipt_file, engine)
+        db.session.flush()
+        event = record_event('processed', receipt_file_id, {'receipt_id': receipt.id, 'merchant_id': receipt.merchant_id})
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        event = record_event('failed', receipt_file_id, {'stage': 'process', 'reason': str(e)})
+        db.session.commit()
+        publish_events(event)
+        raise
+    
+    publish_events(event)
+    
+    return receipt
+
+
+def _create_receipt(receipt_file, engine):
+    """Extracts text from a receipt file and adds the parsed receipt with its items to the session."""
+    receipt_file_id = receipt_file.id
+    
     # Extract text from PDF
-    text, confidence = extract_text_from_pdf(receipt_file.file_path)
+    text, confidence = extract_text_from_pdf(receipt_file.file_path, engine)
     
     # Parse receipt data
     receipt_data = parse_receipt(text)
@@ -65,6 +100,7 @@ def process_receipt_file(receipt_file_id):
     receipt = Receipt(
         receipt_file_id=receipt_file_id,
         merchant_name=receipt_data['merchant_name'],
+        merchant_id=receipt_data['merchant_id'],
         purchased_at=receipt_data['purchased_at'],
         total_amount=receipt_data['total_amount'],
         currency=receipt_data['currency'],
@@ -97,7 +133,6 @@ def process_receipt_file(receipt_file_id):
     
     # Mark receipt file as processed
     receipt_file.is_processed = True
-    db.session.commit()
     
     return receipt
 
@@ -0,0 +1,359 @@
+"""End-to-end load test for the receipt processing API.
+
+Starts the app under gunicorn against a throwaway SQLite database (or targets an
+already running server), replays a mixed workload of receipt uploads and reads
+from concurrent clients and prints per-endpoint throughput and latency as JSON.
+
+    python -m loadtest.runner --concurrency 16 --duration 60 --stub-ocr --output results.json
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from loadtest.synthetic import generate_receipts
+from loadtest.vision_stub import start_vision_stub
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class LoadTestError(Exception):
+    """Raised when the server under test can't be started or reached."""
+
+
+class Stats:
+    """Thread-safe collection of request latencies per endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.completed_flows = 0
+
+    def record(self, endpoint, elapsed, ok):
+        with self._lock:
+            self.latencies[endpoint].append(elapsed)
+            if not ok:
+                self.errors[endpoint] += 1
+
+    def flow_completed(self):
+        with self._lock:
+            self.completed_flows += 1
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = min(len(sorted_values), max(1, math.ceil(pct / 100.0 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+class Client:
+    """Minimal keep-alive HTTP client for one virtual user."""
+
+    def __init__(self, base_url, stats, timeout=60):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.stats = stats
+        self.timeout = timeout
+        self.conn = None
+
+    def request(self, method, path, endpoint, body=None, headers=None):
+        """Sends a request and records its latency under endpoint. Returns (status, parsed JSON body)."""
+        start = time.perf_counter()
+        status, payload = 0, None
+        try:
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self.conn.request(method, path, body=body, headers=headers or {})
+            response = self.conn.getresponse()
+            raw = response.read()
+            status = response.status
+            if response.will_close:
+                self.close()
+            payload = json.loads(raw) if raw else None
+        except (OSError, http.client.HTTPException, ValueError):
+            self.close()
+        self.stats.record(endpoint, time.perf_counter() - start, 200 <= status < 300)
+        return status, payload
+
+    def post_json(self, path, data):
+        return self.request('POST', path, f'POST {path}', json.dumps(data).encode(),
+                            {'Content-Type': 'application/json'})
+
+    def upload(self, file_name, pdf_bytes):
+        boundary = uuid.uuid4().hex
+        body = (
+            f'--{boundary}\r\n'
+            f'Content-Disposition: form-data; name="file"; filename="{file_name}"\r\n'
+            'Content-Type: application/pdf\r\n\r\n'
+        ).encode() + pdf_bytes + f'\r\n--{boundary}--\r\n'.encode()
+        return self.request('POST', '/api/upload', 'POST /api/upload', body,
+                            {'Content-Type': f'multipart/form-data; boundary={boundary}'})
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def run_write_flow(client, receipt):
+    """Uploads, validates and processes one receipt. Returns the created receipt id or None."""
+    file_name, pdf_bytes = receipt
+    # Unique names keep concurrent uploads from overwriting each other on disk
+    status, payload = client.upload(f'{uuid.uuid4().hex[:8]}_{file_name}', pdf_bytes)
+    if status != 201:
+        return None
+    receipt_file_id = payload['receipt_file_id']
+
+    status, payload = client.post_json('/api/validate', {'receipt_file_id': receipt_file_id})
+    if status != 200 or not payload.get('is_valid'):
+        return None
+
+    status, payload = client.post_json('/api/process', {'receipt_file_id': receipt_file_id})
+    if status != 200:
+        return None
+    client.stats.flow_completed()
+    return payload['receipt_id']
+
+
+def run_read(client, rng, receipt_ids):
+    """Lists a page of receipts or fetches a single known receipt."""
+    if receipt_ids and rng.random() < 0.5:
+        receipt_id = rng.choice(receipt_ids)
+        client.request('GET', f'/api/receipts/{receipt_id}', 'GET /api/receipts/<id>')
+    else:
+        # Stay within pages that exist; the listing endpoint 404s past the last page
+        page = rng.randint(1, max(1, min(5, len(receipt_ids) // 10)))
+        client.request('GET', f'/api/receipts?page={page}&per_page=10', 'GET /api/receipts')
+
+
+def run_workload(base_url, receipts, concurrency, duration, read_ratio, seed):
+    """Runs concurrent virtual users for duration seconds and returns the collected stats and wall time."""
+    stats = Stats()
+    receipt_ids = []
+    ids_lock = threading.Lock()
+    stop = threading.Event()
+
+    def virtual_user(index):
+        rng = random.Random(seed * 1000 + index)
+        client = Client(base_url, stats)
+        try:
+            while not stop.is_set():
+                if rng.random() < read_ratio:
+                    with ids_lock:
+                        known = list(receipt_ids[-500:])
+                    run_read(client, rng, known)
+                else:
+                    receipt_id = run_write_flow(client, rng.choice(receipts))
+                    if receipt_id is not None:
+                        with ids_lock:
+                            receipt_ids.append(receipt_id)
+        finally:
+            client.close()
+
+    threads = [threading.Thread(target=virtual_user, args=(i,), daemon=True) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    stop.wait(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return stats, time.perf_counter() - start
+
+
+def build_report(stats, elapsed, settings):
+    """Summarises throughput and latency percentiles per endpoint."""
+    endpoints = {}
+    total_requests = 0
+    total_errors = 0
+    for endpoint, values in sorted(stats.latencies.items()):
+        values = sorted(values)
+        errors = stats.errors.get(endpoint, 0)
+        total_requests += len(values)
+        total_errors += errors
+        endpoints[endpoint] = {
+            'requests': len(values),
+            'errors': errors,
+            'throughput_rps': round(len(values) / elapsed, 2),
+            'mean_ms': round(sum(values) / len(values) * 1000, 2),
+            'p50_ms': round(percentile(values, 50) * 1000, 2),
+            'p95_ms': round(percentile(values, 95) * 1000, 2),
+            'p99_ms': round(percentile(values, 99) * 1000, 2),
+            'max_ms': round(values[-1] * 1000, 2)
+        }
+
+    return {
+        'commit': git_commit(),
+        'settings': settings,
+        'elapsed_s': round(elapsed, 2),
+        'requests': total_requests,
+        'errors': total_errors,
+        'throughput_rps': round(total_requests / elapsed, 2),
+        'receipts_processed': stats.completed_flows,
+        'uploads_per_second': round(stats.completed_flows / elapsed, 2),
+        'endpoints': endpoints
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def wait_until_healthy(base_url, timeout=30):
+    parts = urlsplit(base_url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=2)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                conn.close()
+                return
+        except OSError:
+            pass
+        time.sleep(0.25)
+    raise LoadTestError(f'Server at {base_url} did not become healthy within {timeout}s')
+
+
+def start_server(args, work_dir, vision_endpoint=None):
+    """Starts gunicorn with a throwaway database and upload folder. Returns the process and its base URL."""
+    env = dict(os.environ)
+    env['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(work_dir, 'loadtest.db')
+    env['UPLOAD_FOLDER'] = os.path.join(work_dir, 'uploads')
+    if args.ocr_engine:
+        env['OCR_ENGINE'] = args.ocr_engine
+    elif vision_endpoint:
+        env['OCR_ENGINE'] = 'google_vision'
+    elif args.stub_ocr:
+        env['OCR_ENGINE'] = 'stub'
+    if vision_endpoint:
+        env['GOOGLE_VISION_ENDPOINT'] = vision_endpoint
+        env['GOOGLE_VISION_API_KEY'] = 'loadtest'
+
+    # Create the tables once up front so workers don't race each other to create them
+    subprocess.run([sys.executable, '-c', 'from app import create_app; create_app()'],
+                   cwd=ROOT_DIR, env=env, check=True)
+
+    bind = f'127.0.0.1:{args.port}'
+    command = [
+        sys.executable, '-m', 'gunicorn', 'app:create_app()',
+        '--bind', bind,
+        '--workers', str(args.workers),
+        '--worker-class', args.worker_class,
+        '--threads', str(args.threads),
+        '--log-level', 'warning'
+    ]
+    process = subprocess.Popen(command, cwd=ROOT_DIR, env=env)
+    base_url = f'http://{bind}'
+    try:
+        wait_until_healthy(base_url)
+    except LoadTestError:
+        stop_server(process)
+        raise
+    return process, base_url
+
+
+def stop_server(process):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the receipt processing API')
+    parser.add_argument('--url', help='Target an already running server instead of starting gunicorn')
+    parser.add_argument('--concurrency', type=int, default=8, help='Number of concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=30, help='Test duration in seconds')
+    parser.add_argument('--read-ratio', type=float, default=0.7,
+                        help='Fraction of operations that are reads; the rest upload and process a receipt')
+    parser.add_argument('--receipts', type=int, default=50, help='Number of distinct synthetic receipts to upload')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for receipt generation and the workload mix')
+    parser.add_argument('--stub-ocr', action='store_true', help='Use the deterministic stub OCR engine instead of Tesseract')
+    parser.add_argument('--ocr-engine', help="OCR engine or fallback chain for the server, e.g. 'google_vision,tesseract'")
+    parser.add_argument('--vision-stub', action='store_true',
+                        help='Point the google_vision engine at a local stand-in server instead of the real API')
+    parser.add_argument('--vision-stub-latency', type=float, default=0.2,
+                        help='Seconds the stand-in Vision server waits before answering each request')
+    parser.add_argument('--workers', type=int, default=2, help='Gunicorn worker processes')
+    parser.add_argument('--worker-class', default='gthread', help='Gunicorn worker class')
+    parser.add_argument('--threads', type=int, default=4, help='Threads per gunicorn worker')
+    parser.add_argument('--port', type=int, default=5055, help='Port for the gunicorn server')
+    parser.add_argument('--database-url', help='Database URL for the server; defaults to a temporary SQLite file')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    args = parser.parse_args(argv)
+    if args.url and args.vision_stub:
+        parser.error('--vision-stub only applies to a server started by the runner, not --url')
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    receipts = generate_receipts(args.receipts, seed=args.seed)
+    settings = {
+        'concurrency': args.concurrency,
+        'duration_s': args.duration,
+        'read_ratio': args.read_ratio,
+        'seed': args.seed,
+        'stub_ocr': args.stub_ocr,
+        'ocr_engine': args.ocr_engine,
+        'vision_stub_latency': args.vision_stub_latency if args.vision_stub else None,
+        'workers': None if args.url else args.workers,
+        'worker_class': None if args.url else args.worker_class,
+        'threads': None if args.url else args.threads
+    }
+
+    work_dir = tempfile.mkdtemp(prefix='receipt-loadtest-')
+    process = None
+    vision_stub = None
+    try:
+        if args.vision_stub:
+            vision_stub = start_vision_stub(latency=args.vision_stub_latency)
+
+        if args.url:
+            base_url = args.url.rstrip('/')
+            wait_until_healthy(base_url)
+        else:
+            process, base_url = start_server(args, work_dir, vision_stub.endpoint if vision_stub else None)
+
+        stats, elapsed = run_workload(base_url, receipts, args.concurrency, args.duration,
+                                      args.read_ratio, args.seed)
+    finally:
+        if process is not None:
+            stop_server(process)
+        if vision_stub is not None:
+            vision_stub.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = json.dumps(build_report(stats, elapsed, settings), indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+import json
+import os
+import random
+
+MERCHANTS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app', 'data', 'merchants.json')
+
+ITEM_NAMES = [
+    'Coffee', 'Bagel', 'Milk 1 gal', 'Bread', 'Eggs dozen', 'Bananas', 'Paper Towels',
+    'Shampoo', 'Toothpaste', 'Sandwich', 'Orange Juice', 'Batteries AA', 'Notebook', 'Day Pass'
+]
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def build_pdf(lines):
+    """Builds a single page PDF with one line of Helvetica text per entry and returns its bytes."""
+    content = ['BT', '/F1 10 Tf', '12 TL', '40 760 Td']
+    for line in lines:
+        content.append(f'({_escape(line)}) Tj T*')
+    content.append('ET')
+    stream = '\n'.join(content).encode('latin-1', errors='replace')
+
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+        b'/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+        b'<< /Length ' + str(len(stream)).encode() + b' >>\nstream\n' + stream + b'\nendstream',
+    ]
+
+    pdf = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += f'{number} 0 obj\n'.encode() + body + b'\nendobj\n'
+
+    xref_offset = len(pdf)
+    pdf += f'xref\n0 {len(objects) + 1}\n'.encode()
+    pdf += b'0000000000 65535 f \n'
+    for offset in offsets:
+        pdf += f'{offset:010d} 00000 n \n'.encode()
+    pdf += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n'.encode()
+    pdf += f'startxref\n{xref_offset}\n%%EOF\n'.encode()
+    return bytes(pdf)
+
+
+def load_merchant_names(path=MERCHANTS_PATH):
+    """Loads canonical merchant names from the merchant dictionary, so generated receipts exercise matching."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [entry['name'] for entry in json.load(f)]
+    except (OSError, ValueError, KeyError):
+        return ['Corner Store']
+
+
+def generate_receipt_lines(rng, merchants):
+    """Generates the text lines of a plausible receipt."""
+    merchant = rng.choice(merchants)
+    lines = [
+        merchant,
+        f'{rng.randint(1, 9999)} Market Street',
+        f'Date: 2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+        ''
+    ]
+
+    total = 0.0
+    for name in rng.sample(ITEM_NAMES, rng.randint(1, 6)):
+        price = round(rng.uniform(0.5, 40.0), 2)
+        total += price
+        lines.append(f'{name} ${price:.2f}')
+
+    tax = round(total * 0.0875, 2)
+    lines += [
+        '',
+        f'Tax ${tax:.2f}',
+        f'Total ${total + tax:.2f}',
+        f'Card **** {rng.randint(1000, 9999)}'
+    ]
+    return lines
+
+
+def generate_receipts(count, seed=0):
+    """Generates count synthetic receipt PDFs as (file_name, pdf_bytes) pairs. The same seed yields the same files."""
+    rng = random.Random(seed)
+    merchants = load_merchant_names()
+    receipts = []
+    for i in range(count):
+        lines = generate_receipt_lines(rng, merchants)
+        receipts.append((f'synthetic_{seed}_{i:05d}.pdf', build_pdf(lines)))
+    return receipts
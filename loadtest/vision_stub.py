@@ -0,0 +1,108 @@
+"""Local stand-in for the Google Cloud Vision images:annotate endpoint.
+
+Answers each image with deterministic receipt text derived from a hash of the image
+bytes, after an optional delay to mimic a cloud round trip, so the google_vision OCR
+engine can be exercised without network access.
+
+    python -m loadtest.vision_stub --port 5056 --latency 0.2
+    GOOGLE_VISION_ENDPOINT=http://127.0.0.1:5056/v1/images:annotate GOOGLE_VISION_API_KEY=stub \
+        OCR_ENGINE=google_vision flask run
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from loadtest.synthetic import generate_receipt_lines, load_merchant_names
+
+
+class VisionStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, so clients can reuse connections
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            payload = json.loads(self.rfile.read(length))
+            requests = payload['requests']
+        except (ValueError, KeyError):
+            return self._send(400, {'error': {'code': 400, 'message': 'Invalid request body'}})
+
+        server = self.server
+        with server.stats_lock:
+            server.request_count += 1
+            server.image_count += len(requests)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+
+        try:
+            if server.latency:
+                time.sleep(server.latency)
+        finally:
+            with server.stats_lock:
+                server.in_flight -= 1
+
+        if server.error_status:
+            return self._send(server.error_status, {'error': {'code': server.error_status, 'message': 'Stub error'}})
+
+        responses = []
+        for request in requests:
+            content = request.get('image', {}).get('content', '')
+            seed = int(hashlib.sha256(content.encode()).hexdigest()[:16], 16)
+            text = '\n'.join(generate_receipt_lines(random.Random(seed), server.merchants))
+            responses.append({
+                'fullTextAnnotation': {
+                    'text': text,
+                    'pages': [{'confidence': 0.95}]
+                }
+            })
+        self._send(200, {'responses': responses})
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_vision_stub(port=0, latency=0.0, error_status=None):
+    """Starts the stand-in server on a background thread. Returns the server; its endpoint is server.endpoint.
+    error_status makes every request fail with that HTTP status."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), VisionStubHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.error_status = error_status
+    server.merchants = load_merchant_names()
+    server.stats_lock = threading.Lock()
+    server.request_count = 0
+    server.image_count = 0
+    server.in_flight = 0
+    server.max_in_flight = 0
+    server.endpoint = f'http://127.0.0.1:{server.server_address[1]}/v1/images:annotate'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run a local stand-in for the Google Vision API')
+    parser.add_argument('--port', type=int, default=5056)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds to wait before answering each request')
+    args = parser.parse_args(argv)
+
+    server = start_vision_stub(args.port, args.latency)
+    print(f'Google Vision stand-in listening at {server.endpoint}')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,17 @@
+import pytest
+from app import create_app, db
+
+
+@pytest.fixture
+def app():
+    """Application configured for testing with an in-memory database"""
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+from app import db
+from app.models import ReceiptEvent, ReceiptFile
+from app.services.event_service import (
+    event_hub,
+    get_events_since,
+    prune_events,
+    publish_events,
+    record_event,
+    stream_events
+)
+
+
+def make_receipt_file():
+    receipt_file = ReceiptFile(file_name='r.pdf', file_path='/tmp/r.pdf')
+    db.session.add(receipt_file)
+    db.session.commit()
+    return receipt_file
+
+
+def make_event(event_type, receipt_file_id, **fields):
+    event = record_event(event_type, receipt_file_id)
+    for name, value in fields.items():
+        setattr(event, name, value)
+    db.session.commit()
+    return event
+
+
+def test_recorded_event_is_committed_with_state_change(app):
+    receipt_file = make_receipt_file()
+    receipt_file.is_valid = True
+    record_event('validated', receipt_file.id)
+    db.session.rollback()
+
+    assert ReceiptEvent.query.count() == 0
+
+
+def test_publish_events_notifies_subscribers(app):
+    receipt_file = make_receipt_file()
+    event = make_event('uploaded', receipt_file.id)
+
+    subscription = event_hub.subscribe()
+    try:
+        publish_events(event)
+        assert subscription.get(timeout=1)['id'] == event.id
+    finally:
+        event_hub.unsubscribe(subscription)
+
+
+def test_stream_resumes_after_last_event_id(app):
+    receipt_file = make_receipt_file()
+    first_id = make_event('uploaded', receipt_file.id).id
+    second_id = make_event('validated', receipt_file.id).id
+
+    stream = stream_events(last_event_id=first_id)
+    assert next(stream).startswith('retry:')
+    message = next(stream)
+    stream.close()
+
+    assert message.startswith(f'id: {second_id}\nevent: validated\n')
+
+
+def test_stream_delivers_late_events_once(app):
+    app.config['EVENT_STREAM_HEARTBEAT'] = 0.2
+    receipt_file_id = make_receipt_file().id
+
+    stream = stream_events()
+    next(stream)
+    earlier = make_event('uploaded', receipt_file_id)
+    later = make_event('validated', receipt_file_id)
+    earlier_id, later_id = earlier.id, later.id
+
+    # Published out of id order, as concurrent commits can be, with a repeat
+    publish_events(later, earlier, later)
+    received = [next(stream), next(stream), next(stream)]
+    stream.close()
+
+    assert [m.split('\n')[0] for m in received] == [f'id: {later_id}', f'id: {earlier_id}', ': keepalive']
+
+
+def test_database_stream_delivers_events_committed_out_of_id_order(app):
+    app.config.update(EVENT_STREAM_BACKEND='database', EVENT_STREAM_POLL_INTERVAL=0.05, EVENT_STREAM_HEARTBEAT=5)
+    receipt_file_id = make_receipt_file().id
+
+    stream = stream_events()
+    next(stream)
+    make_event('uploaded', receipt_file_id, id=1)
+    make_event('processed', receipt_file_id, id=3)
+    received = [next(stream), next(stream)]
+
+    # Id 2 was allocated before id 3 but only became visible afterwards
+    make_event('validated', receipt_file_id, id=2)
+    received.append(next(stream))
+    make_event('uploaded', receipt_file_id, id=4)
+    received.append(next(stream))
+    stream.close()
+
+    assert [m.split('\n')[0] for m in received] == ['id: 1', 'id: 3', 'id: 2', 'id: 4']
+
+
+def test_prune_deletes_expired_events_and_resume_starts_at_oldest(app):
+    receipt_file = make_receipt_file()
+    expired_id = make_event('uploaded', receipt_file.id, created_at=datetime.utcnow() - timedelta(days=30)).id
+    kept_id = make_event('validated', receipt_file.id).id
+
+    assert prune_events(retention_days=7) == 1
+    assert [event['id'] for event in get_events_since(0)] == [kept_id]
+    assert [event['id'] for event in get_events_since(expired_id - 1)] == [kept_id]
+
+
+def test_events_endpoint_rejects_invalid_filters(client):
+    assert client.get('/api/events?receipt_file_id=abc').status_code == 400
+    assert client.get('/api/events?types=bogus').status_code == 400
+    assert client.get('/api/events', headers={'Last-Event-ID': 'x'}).status_code == 400
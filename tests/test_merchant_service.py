@@ -0,0 +1,80 @@
+import pytest
+from app.services.merchant_service import MerchantMatcher
+from app.services.ocr_service import parse_receipt
+
+MERCHANTS = [
+    {'id': 'walmart', 'name': 'Walmart', 'aliases': ['Wal-Mart', 'Walmart Supercenter']},
+    {'id': 'bart', 'name': 'BART', 'aliases': ['Bay Area Rapid Transit']},
+    {'id': 'target', 'name': 'Target', 'aliases': []},
+    {'id': 'cvs', 'name': 'CVS Pharmacy', 'aliases': ['CVS']},
+    {'id': 'costco', 'name': 'Costco', 'aliases': ['Costco Wholesale']},
+    {'id': 'safeway', 'name': 'Safeway', 'aliases': []},
+]
+
+
+@pytest.fixture
+def matcher():
+    return MerchantMatcher(MERCHANTS)
+
+
+def test_exact_alias_in_header(matcher):
+    result = matcher.match("WAL-MART SUPERCENTER #123\nMilk $3.00")
+    assert result['merchant_id'] == 'walmart'
+    assert result['score'] == 1.0
+
+
+def test_fuzzy_header_match(matcher):
+    result = matcher.match("B4Y AREA RAPlD TRANSIT\nDay Pass $5.00")
+    assert result['merchant_id'] == 'bart'
+    assert result['score'] < 1.0
+
+
+def test_misspelled_header_beats_exact_alias_further_down(matcher):
+    assert matcher.match("Walrnart Supercenter\n#1234\nBART Ticket $2.00")['merchant_id'] == 'walmart'
+
+
+def test_aliases_outside_header_are_ignored(matcher):
+    text = "Joe's Cafe\n1\n2\n3\n4\nCoffee $3.00\nPaid with CVS gift card"
+    assert matcher.match(text) is None
+
+
+def test_short_aliases_only_match_exactly(matcher):
+    assert matcher.match("Art Gallery") is None
+    assert matcher.match("BART\nDay Pass")['merchant_id'] == 'bart'
+
+
+def test_partial_words_do_not_match(matcher):
+    assert matcher.match("Targeting Supplies") is None
+
+
+@pytest.mark.parametrize('text, merchant_name', [
+    ("Corner Deli\n123 Main\nTarget practice kit $4.00\nTotal $4.00", 'Corner Deli'),
+    ("Joe's Cafe\nCoffee $3.00\nTotal $3.00\nPaid with CVS gift card", "Joe's Cafe"),
+    ("Whole Foods\nBART Clipper reload $20.00", 'Whole Foods'),
+])
+def test_parse_receipt_keeps_header_merchant(app, text, merchant_name):
+    receipt_data = parse_receipt(text)
+    assert receipt_data['merchant_name'] == merchant_name
+    assert receipt_data['merchant_id'] is None
+
+
+@pytest.mark.parametrize('text, merchant_id', [
+    ("Save money. Live better.\nWALMART\nMilk $3.00", 'walmart'),
+    ("Store #1234\nTarget\nSoap $2.00", 'target'),
+    ("~~~~~\nCOSTCO WHOLESALE\nEggs $4.00", 'costco'),
+    ("Welcome to\nSafeway\nBread $2.50", 'safeway'),
+])
+def test_parse_receipt_finds_merchant_below_noisy_first_line(app, text, merchant_id):
+    assert parse_receipt(text)['merchant_id'] == merchant_id
+
+
+def test_parse_receipt_does_not_fuzzy_match_short_aliases(app):
+    receipt_data = parse_receipt("Art Gallery\n")
+    assert receipt_data['merchant_name'] == 'Art Gallery'
+    assert receipt_data['merchant_id'] is None
+
+
+def test_parse_receipt_uses_canonical_merchant(app):
+    receipt_data = parse_receipt("--- PAGE 1 ---\nWAL-MART\nMilk $3.00\nTotal $3.00")
+    assert receipt_data['merchant_name'] == 'Walmart'
+    assert receipt_data['merchant_id'] == 'walmart'
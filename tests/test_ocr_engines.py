@@ -0,0 +1,152 @@
+import time
+import pytest
+from PIL import Image
+from app import db
+from app.models import Receipt, ReceiptEvent, ReceiptFile
+from app.services import ocr_engines
+from app.services.ocr_engines import GoogleVisionEngine, OCRError, get_ocr_engine
+from app.services.receipt_service import process_receipt_file
+from loadtest.synthetic import build_pdf
+from loadtest.vision_stub import start_vision_stub
+
+
+def fake_pages(count):
+    """Distinct blank images standing in for rendered PDF pages"""
+    return [Image.new('RGB', (16, 16), (i, 0, 0)) for i in range(count)]
+
+
+@pytest.fixture(autouse=True)
+def fresh_engines(monkeypatch):
+    """Engines are cached per process, so each test builds its own from the test config"""
+    monkeypatch.setattr(ocr_engines, '_instances', {})
+
+
+@pytest.fixture
+def vision_stub(app):
+    stub = start_vision_stub()
+    app.config.update(
+        GOOGLE_VISION_ENDPOINT=stub.endpoint,
+        GOOGLE_VISION_API_KEY='test-key',
+        OCR_BATCH_SIZE=2,
+        OCR_MAX_CONCURRENCY=4,
+        OCR_RATE_LIMIT=0,
+        OCR_REQUEST_TIMEOUT=5
+    )
+    yield stub
+    stub.shutdown()
+
+
+@pytest.fixture
+def pages(monkeypatch):
+    """Sets how many pages the Google Vision engine renders for any PDF"""
+    page_count = {'value': 1}
+    monkeypatch.setattr(GoogleVisionEngine, 'render_pages', lambda self, pdf_path: fake_pages(page_count['value']))
+    return page_count
+
+
+@pytest.fixture
+def receipt_pdf(tmp_path):
+    path = tmp_path / 'receipt.pdf'
+    path.write_bytes(build_pdf(['Walmart', 'Milk $3.00', 'Total $3.00']))
+    return str(path)
+
+
+def test_pages_are_sent_in_batches(vision_stub, pages):
+    pages['value'] = 5
+
+    text, confidence = get_ocr_engine('google_vision').extract('receipt.pdf')
+
+    assert vision_stub.request_count == 3
+    assert vision_stub.image_count == 5
+    assert text.count('--- PAGE') == 5
+    assert confidence == pytest.approx(0.95)
+
+
+def test_batches_run_concurrently_up_to_limit(app, vision_stub, pages):
+    app.config['OCR_MAX_CONCURRENCY'] = 2
+    vision_stub.latency = 0.2
+    pages['value'] = 8
+
+    start = time.monotonic()
+    get_ocr_engine('google_vision').extract('receipt.pdf')
+    elapsed = time.monotonic() - start
+
+    assert vision_stub.request_count == 4
+    assert vision_stub.max_in_flight == 2
+    assert elapsed < 4 * vision_stub.latency
+
+
+def test_timeout_raises_ocr_error(app, vision_stub, pages):
+    app.config['OCR_REQUEST_TIMEOUT'] = 0.2
+    vision_stub.latency = 1
+
+    with pytest.raises(OCRError):
+        get_ocr_engine('google_vision').extract('receipt.pdf')
+
+
+def test_http_error_raises_ocr_error(vision_stub, pages):
+    vision_stub.error_status = 500
+
+    with pytest.raises(OCRError, match='HTTP 500'):
+        get_ocr_engine('google_vision').extract('receipt.pdf')
+
+
+def test_fallback_chain_uses_next_engine(vision_stub, pages, receipt_pdf):
+    vision_stub.error_status = 503
+
+    text, confidence = get_ocr_engine('google_vision,stub').extract(receipt_pdf)
+
+    assert vision_stub.request_count == 1
+    assert 'Walmart' in text
+    assert confidence == 1.0
+
+
+def test_fallback_chain_raises_when_every_engine_fails(vision_stub, pages, monkeypatch):
+    vision_stub.error_status = 503
+    monkeypatch.setattr(ocr_engines.TesseractEngine, 'render_pages', lambda self, pdf_path: fake_pages(1))
+    monkeypatch.setattr(ocr_engines.pytesseract, 'image_to_data', lambda *args, **kwargs: 1 / 0)
+
+    with pytest.raises(OCRError, match='Tesseract'):
+        get_ocr_engine('google_vision,tesseract').extract('receipt.pdf')
+
+
+@pytest.mark.parametrize('spec', ['nope', 'stub,nope', 5, ['stub']])
+def test_invalid_engine_spec_is_rejected(app, spec):
+    with pytest.raises(ValueError):
+        get_ocr_engine(spec)
+
+
+def make_valid_receipt_file(path):
+    receipt_file = ReceiptFile(file_name='receipt.pdf', file_path=path, is_valid=True)
+    db.session.add(receipt_file)
+    db.session.commit()
+    return receipt_file.id
+
+
+def test_failed_ocr_fails_processing(vision_stub, pages, receipt_pdf):
+    vision_stub.error_status = 500
+    receipt_file_id = make_valid_receipt_file(receipt_pdf)
+
+    with pytest.raises(OCRError):
+        process_receipt_file(receipt_file_id, 'google_vision')
+
+    assert Receipt.query.count() == 0
+    assert ReceiptEvent.query.order_by(ReceiptEvent.id.desc()).first().event_type == 'failed'
+
+
+def test_process_with_requested_engine(app, receipt_pdf, tmp_path):
+    app.config['PROCESSED_FOLDER'] = str(tmp_path)
+    receipt_file_id = make_valid_receipt_file(receipt_pdf)
+
+    receipt = process_receipt_file(receipt_file_id, 'stub')
+
+    assert receipt.merchant_id == 'walmart'
+    assert receipt.confidence_score == 1.0
+
+
+def test_process_endpoint_rejects_non_string_engine(client, receipt_pdf):
+    receipt_file_id = make_valid_receipt_file(receipt_pdf)
+
+    response = client.post('/api/process', json={'receipt_file_id': receipt_file_id, 'ocr_engine': 5})
+
+    assert response.status_code == 400